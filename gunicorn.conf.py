@@ -0,0 +1,22 @@
+import multiprocessing
+
+# Gunicorn configuration for serving iss_tracker:app
+
+bind = "0.0.0.0:5000"
+
+# gevent workers monkey-patch sockets, so requests blocked on NASA or redis yield to others
+worker_class = "gevent"
+workers = multiprocessing.cpu_count()
+worker_connections = 1000
+
+
+def post_worker_init(worker):
+    import reverse_geocoder
+
+    from iss_tracker import start_cache_refresher
+
+    # Build the GeoNames k-d tree now; it is CPU-bound and would block the worker's first /location request
+    reverse_geocoder.search([(0.0, 0.0)], mode=1)
+
+    # Keep the redis cache warm; workers share a redis lock so only one refreshes per interval
+    start_cache_refresher()
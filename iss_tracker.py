@@ -1,22 +1,71 @@
 import logging
-from datetime import datetime, timezone
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Tuple, Optional
-import json
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+import hashlib
+import xml.sax
 
-import requests
-import xmltodict
+import requests_cache
 import redis
 import math
-from geopy.geocoders import Nominatim
-from dateutil import parser
-from flask import Flask, request, jsonify
+import msgpack
+import numpy as np
+import orjson
+import reverse_geocoder
+from flask import Flask, Response, request, jsonify
+from flask.json.provider import JSONProvider
 
 
 ISS_DATA_URL = "https://nasa-public-data.s3.amazonaws.com/iss-coords/current/ISS_OEM/ISS.OEM_J2K_EPH.xml"
 
+# EPOCH format in the OEM file, e.g. 2025-058T11:53:00.000Z (day-of-year)
+EPOCH_FORMAT = "%Y-%jT%H:%M:%S.%fZ"
+
+UNIX_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+EARTH_RADIUS_KM = 6371
+
+# Background refresh period, and how long redis keeps the data if refreshes stop succeeding
+REFRESH_INTERVAL_SECONDS = 120
+CACHE_TTL_SECONDS = 3600
+
+# Positions farther than this from the nearest known city are reported as over the ocean
+OCEAN_DISTANCE_KM = 200
+
+# State vector fields: position (km) followed by velocity (km/s)
+STATE_VECTOR_FIELDS = ("X", "Y", "Z", "X_DOT", "Y_DOT", "Z_DOT")
+
+class OrjsonProvider(JSONProvider):
+    """
+    Flask JSON provider backed by orjson, so jsonify can also serialize NumPy values directly.
+    """
+    option = orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, option=self.option).decode()
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        # Hand orjson's bytes to the response as-is instead of round-tripping through str
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj, option=self.option), mimetype="application/json")
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+
+r = redis.Redis(host='redis-db', port=6379, db=0) # Values are binary msgpack payloads, so responses stay bytes
 
-r = redis.Redis(host='redis-db', port=6379, db=0, decode_responses=True) # Redis (b'string') decode responses into strings
+# sqlite file backing the HTTP cache of the OEM download
+HTTP_CACHE_PATH = os.environ.get("ISS_HTTP_CACHE_PATH", "iss_cache.sqlite")
+
+# Process-local copy of the redis data and the version it was loaded at
+_local_cache: Dict[str, Any] = {"version": None, "state_vectors": None}
 
 def setup_logging():
     logging.basicConfig(
@@ -27,83 +76,273 @@ def setup_logging():
     )
 
 setup_logging()
+logger = logging.getLogger(__name__)
+
+@dataclass(eq=False)
+class StateVectors:
+    """
+    ISS state vectors stored column-wise, one array per quantity.
+
+    Attributes:
+        epochs (List[str]): EPOCH string of each state vector, in ascending order.
+        positions (np.ndarray): Float64 array of shape (N, 3) with X, Y, Z in km.
+        velocities (np.ndarray): Float64 array of shape (N, 3) with X_DOT, Y_DOT, Z_DOT in km/s.
+    """
+    epochs: List[str]
+    positions: np.ndarray
+    velocities: np.ndarray
+
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]]) -> "StateVectors":
+        """
+        Build state vectors from a list of dicts keyed by EPOCH and STATE_VECTOR_FIELDS.
+
+        Args:
+            records (List[Dict[str, Any]]): List of dicts of ISS data.
+
+        Returns:
+            StateVectors: The same data stored column-wise.
+        """
+        states = np.array(
+            [[record[field] for field in STATE_VECTOR_FIELDS] for record in records],
+            dtype=np.float64,
+        ).reshape(-1, len(STATE_VECTOR_FIELDS))
+        epochs = [record["EPOCH"] for record in records]
+        return cls(epochs, np.ascontiguousarray(states[:, :3]), np.ascontiguousarray(states[:, 3:]))
+
+    @classmethod
+    def from_msgpack(cls, payload: bytes) -> "StateVectors":
+        """
+        Load state vectors from a payload produced by to_msgpack.
+
+        Args:
+            payload (bytes): msgpack payload.
+
+        Returns:
+            StateVectors: State vectors with read-only arrays viewing the payload buffers.
+        """
+        data = msgpack.unpackb(payload)
+        n = data["n"]
+        positions = np.frombuffer(data["positions"], dtype=np.float64).reshape(n, 3)
+        velocities = np.frombuffer(data["velocities"], dtype=np.float64).reshape(n, 3)
+        return cls(data["epochs"], positions, velocities)
+
+    def to_msgpack(self) -> bytes:
+        """
+        Serialize the state vectors with the arrays stored as raw float64 buffers.
+
+        Returns:
+            bytes: msgpack payload.
+        """
+        return msgpack.packb({
+            "n": len(self),
+            "epochs": self.epochs,
+            "positions": self.positions.tobytes(),
+            "velocities": self.velocities.tobytes(),
+        })
+
+    def __len__(self) -> int:
+        return len(self.epochs)
+
+    def record(self, i: int) -> Dict[str, Any]:
+        """
+        Return a single state vector as a dict.
+
+        Args:
+            i (int): Index of the state vector.
+
+        Returns:
+            Dict[str, Any]: Dict keyed by EPOCH and STATE_VECTOR_FIELDS.
+        """
+        values = self.positions[i].tolist() + self.velocities[i].tolist()
+        return {"EPOCH": self.epochs[i], **dict(zip(STATE_VECTOR_FIELDS, values))}
+
+    def records(self, start: int = 0, stop: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Return a slice of the state vectors as a list of dicts.
+
+        Args:
+            start (int): First index of the slice.
+            stop (Optional[int]): End of the slice (exclusive), or None for the rest of the data.
+
+        Returns:
+            List[Dict[str, Any]]: List of dicts keyed by EPOCH and STATE_VECTOR_FIELDS.
+        """
+        rows = np.hstack((self.positions[start:stop], self.velocities[start:stop])).tolist()
+        return [
+            {"EPOCH": epoch, **dict(zip(STATE_VECTOR_FIELDS, row))}
+            for epoch, row in zip(self.epochs[start:stop], rows)
+        ]
+
+    @cached_property
+    def epoch_index(self) -> Dict[str, int]:
+        """Index of the state vector for each EPOCH string, built on first use."""
+        return {epoch: i for i, epoch in enumerate(self.epochs)}
+
+    @cached_property
+    def speeds(self) -> np.ndarray:
+        """Instantaneous speed (km/s) of every state vector, built on first use."""
+        # Square the row norms and take the root in the same buffer
+        speeds = np.einsum("ij,ij->i", self.velocities, self.velocities)
+        return np.sqrt(speeds, out=speeds)
+
+    @cached_property
+    def epoch_us(self) -> np.ndarray:
+        """Epochs as int64 microseconds since the Unix epoch, built on first use."""
+        return get_epoch_timestamps(self.epochs)
+
+@lru_cache(maxsize=1)
+def get_session() -> requests_cache.CachedSession:
+    """
+    Create the reused HTTP session on first use, so importing the module touches no files.
+
+    Returns:
+        requests_cache.CachedSession: Session that honors the S3 cache headers and revalidates with ETag/Last-Modified.
+    """
+    return requests_cache.CachedSession(HTTP_CACHE_PATH, backend="sqlite", expire_after=120, cache_control=True)
 
-def fetch_iss_data() -> Optional[List[Dict[str, Any]]]:
+def fetch_iss_data() -> Optional[StateVectors]:
     """
-    Fetch ISS state vector data from NASA's API and parse it into a list of dictionaries.
+    Fetch ISS state vector data from NASA's API and parse it into column arrays.
     
     Returns:
-        Optional[List[Dict[str, Any]]]: Parsed ISS state vectors, or None if request fails.
+        Optional[StateVectors]: Parsed ISS state vectors, or None if request fails.
     """
     try:
-        response = requests.get(ISS_DATA_URL)
+        response = get_session().get(ISS_DATA_URL)
 
         if response.ok:
-            iss_data = xmltodict.parse(response.content)
-            parsed_iss_data = parse_iss_data(iss_data)
+            state_vectors = parse_iss_data(response.content)
+
+            # Keep serving the cached data rather than replacing it with an empty set
+            if not state_vectors:
+                logger.error("No state vectors parsed from ISS data, keeping cached data.")
+                return None
             
-            # Store data in redis db
-            r.set("iss_data", json.dumps(parsed_iss_data))
-            logger.info(f"Loaded state vectors into redis db.")
-            return parsed_iss_data
+            # Store data in redis db, with a small version key readers can check first
+            raw = state_vectors.to_msgpack()
+            version = payload_version(raw)
+            with r.pipeline() as pipe:
+                pipe.set("iss_state_vectors", raw, ex=CACHE_TTL_SECONDS)
+                pipe.set("iss_state_vectors_version", version, ex=CACHE_TTL_SECONDS)
+                pipe.execute()
+            update_local_cache(version, state_vectors)
+            logger.info("Loaded state vectors into redis db.")
+            return state_vectors
         else:
-            logging.error(f"Failed to fetch ISS data: {response.status_code}")
+            logger.error("Failed to fetch ISS data: %s", response.status_code)
             return None
     except Exception as e:
-        logging.error(f"Error fetching ISS data: {e}", exc_info=True)
+        logger.error("Error fetching ISS data: %s", e, exc_info=True)
         return None
 
-def parse_iss_data(xml_data: dict) -> List[Dict[str, Any]]:
+class StateVectorHandler(xml.sax.ContentHandler):
+    """
+    SAX handler that collects <stateVector> values straight into flat lists.
+
+    Attributes:
+        epochs (List[str]): EPOCH string of each complete state vector.
+        values (List[float]): STATE_VECTOR_FIELDS values of each state vector, row after row.
     """
-    Parse the ISS data and store as a list of dicts.
+    columns = {field: i for i, field in enumerate(STATE_VECTOR_FIELDS)}
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.epochs: List[str] = []
+        self.values: List[float] = []
+        self.in_state_vector = False
+        self.field: Optional[str] = None
+        self.text: List[str] = []
+        self.epoch = ""
+        self.row: List[float] = []
+        self.error: Optional[ValueError] = None
+
+    def startElement(self, name: str, attrs: Any) -> None:
+        if name == "stateVector":
+            # Missing fields default to 0 like the previous parsers
+            self.in_state_vector = True
+            self.epoch = ""
+            self.row = [0.0] * len(STATE_VECTOR_FIELDS)
+            self.error = None
+        elif self.in_state_vector and (name == "EPOCH" or name in self.columns):
+            self.field = name
+            self.text = []
+
+    def characters(self, content: str) -> None:
+        # Text of one element may arrive in several chunks
+        if self.field is not None:
+            self.text.append(content)
+
+    def endElement(self, name: str) -> None:
+        if name == self.field:
+            text = "".join(self.text).strip()
+            self.field = None
+            if name == "EPOCH":
+                self.epoch = text
+            else:
+                try:
+                    self.row[self.columns[name]] = float(text)
+                except ValueError as ve:
+                    self.error = ve
+        elif name == "stateVector":
+            self.in_state_vector = False
+            if self.error is None:
+                self.epochs.append(self.epoch)
+                self.values.extend(self.row)
+            else:
+                logger.error("ValueError parsing state vector: %r - %s", self.epoch, self.error)
+
+@lru_cache(maxsize=4)
+def parse_iss_data(content: bytes) -> StateVectors:
+    """
+    Stream the ISS XML into column arrays, reusing the result when the same content is fetched again.
 
     Args:
-        xml_data (dict): Parsed XML data in dict.
+        content (bytes): Raw XML response body.
 
     Returns:
-        List[Dict[str, Any]]: List of dicts.
+        StateVectors: Parsed state vectors, shared between callers and not to be mutated.
     """
-    parsed_iss_data = []
+    handler = StateVectorHandler()
 
     try:
-        # Extract data based on xml structure
-        state_vectors = (
-            xml_data.get("ndm", {})
-            .get("oem", {})
-            .get("body", {})
-            .get("segment", {})
-            .get("data", {})
-            .get("stateVector", [])
-        )
+        # expat-backed SAX parser; no element objects are built
+        xml.sax.parseString(content, handler)
 
         # Handle empty data
-        if not state_vectors:
+        if not handler.epochs:
             raise ValueError("No state vectors found in XML data.")
 
-        # Convert data to list of dicts
-        for state_vector in state_vectors:
-            try:
-                data_point = {
-                    "EPOCH": state_vector.get("EPOCH", ""),
-                    "X": float(state_vector.get("X", {}).get("#text", 0)),
-                    "Y": float(state_vector.get("Y", {}).get("#text", 0)),
-                    "Z": float(state_vector.get("Z", {}).get("#text", 0)),
-                    "X_DOT": float(state_vector.get("X_DOT", {}).get("#text", 0)),
-                    "Y_DOT": float(state_vector.get("Y_DOT", {}).get("#text", 0)),
-                    "Z_DOT": float(state_vector.get("Z_DOT", {}).get("#text", 0)),
-                }
-                parsed_iss_data.append(data_point)
-
-            except ValueError as ve:
-                logging.error(f"ValueError parsing state vector: {state_vector} - {ve}")
-
-        return parsed_iss_data
-
     except Exception as e:
-        logging.error(f"Error parsing ISS data: {e}")
-        return []
+        logger.error("Error parsing ISS data: %s", e)
+        return StateVectors.from_records([])
+
+    states = np.array(handler.values, dtype=np.float64).reshape(-1, len(STATE_VECTOR_FIELDS))
+    return StateVectors(handler.epochs, np.ascontiguousarray(states[:, :3]), np.ascontiguousarray(states[:, 3:]))
+
+def payload_version(raw: bytes) -> bytes:
+    """
+    Fingerprint a redis payload so processes can tell whether their copy is current.
+
+    Args:
+        raw (bytes): msgpack payload of the state vectors.
+
+    Returns:
+        bytes: 8-byte BLAKE2b digest of the payload.
+    """
+    return hashlib.blake2b(raw, digest_size=8).digest()
+
+def update_local_cache(version: bytes, state_vectors: StateVectors) -> None:
+    """
+    Replace the process-local ISS data.
+
+    Args:
+        version (bytes): payload_version of the data stored in redis.
+        state_vectors (StateVectors): Parsed ISS state vectors.
+    """
+    _local_cache.update(version=version, state_vectors=state_vectors)
 
-def get_iss_data_cached() -> List[Dict[str, Any]]:
+def get_iss_data_cached() -> Optional[StateVectors]:
     """
     Retrieve cached ISS data from Redis. If not available, fetch from the ISS data.
 
@@ -111,105 +350,186 @@ def get_iss_data_cached() -> List[Dict[str, Any]]:
         None
 
     Returns:
-        iss_data (List[Dict[str, Any]]): A list of ISS data dictionaries if available.
+        Optional[StateVectors]: ISS state vectors if available.
     """
-    data = r.get("iss_data")
+    # Compare the version first; the payload is only transferred when it changed
+    version = r.get("iss_state_vectors_version")
+    if version and version == _local_cache["version"]:
+        logger.debug("ISS data loaded from process cache.")
+        return _local_cache["state_vectors"]
+
+    data = r.get("iss_state_vectors") if version else None
     if data:
+        update_local_cache(payload_version(data), StateVectors.from_msgpack(data))
         logger.info("ISS data loaded from redis db.")
-        return json.loads(data)
+        return _local_cache["state_vectors"]
     logger.info("No ISS data found in redis db, fetching from ISS")
     return fetch_iss_data()
 
-def get_time_range(iss_data: List[Dict[str, Any]]) -> Tuple[datetime, datetime]:
+def refresh_iss_data() -> None:
+    """
+    Fetch fresh ISS data into redis unless another worker refreshed it this interval.
+    """
+    # The lock is left to expire rather than released, so it also spaces refreshes across workers
+    lock = r.lock("iss_state_vectors_refresh", timeout=REFRESH_INTERVAL_SECONDS)
+    if lock.acquire(blocking=False):
+        fetch_iss_data()
+
+def _refresh_loop() -> None:
+    while True:
+        try:
+            refresh_iss_data()
+        except Exception as e:
+            logger.error("Error refreshing ISS data: %s", e, exc_info=True)
+        time.sleep(REFRESH_INTERVAL_SECONDS)
+
+def start_cache_refresher() -> threading.Thread:
+    """
+    Start a daemon thread that keeps the redis cache warm so requests never miss it.
+
+    Returns:
+        threading.Thread: The started refresher thread.
+    """
+    thread = threading.Thread(target=_refresh_loop, name="iss-cache-refresher", daemon=True)
+    thread.start()
+    return thread
+
+def get_time_range(state_vectors: StateVectors) -> Tuple[datetime, datetime]:
     """
     Calculate the range of data using timestamps from the first and last epochs.
 
     Args:
-        iss_data (List[Dict[str, Any]]): List of dicts containing ISS data.
+        state_vectors (StateVectors): ISS state vectors.
     
     Returns:
         Tuple[datetime, datetime]: A tuple with the first and last timestamps.
     """
-    first_epoch = iss_data[0]["EPOCH"]
-    last_epoch = iss_data[-1]["EPOCH"]
+    first_epoch = state_vectors.epochs[0]
+    last_epoch = state_vectors.epochs[-1]
 
     # Formate to readable datetime
-    time_format = "%Y-%jT%H:%M:%S.%fZ"
-    first_time = datetime.strptime(first_epoch, time_format)
-    last_time = datetime.strptime(last_epoch, time_format)
+    first_time = datetime.strptime(first_epoch, EPOCH_FORMAT)
+    last_time = datetime.strptime(last_epoch, EPOCH_FORMAT)
 
     return first_time, last_time
 
-def get_closest_data_point(iss_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+def to_unix_us(value: datetime) -> int:
     """
-    Find the closest data point to the current time in UTC time zone.
+    Convert an aware datetime into integer microseconds since the Unix epoch.
 
     Args:
-        iss_data (List[Dict[str, Any]): List of dicts from ISS data.
+        value (datetime): Timezone-aware datetime.
 
     Returns:
-        Dict[str, Any]: Dict of the closest data point.
+        int: Microseconds since 1970-01-01T00:00:00Z.
     """
-    # Get current UTC time
-    now = datetime.now(timezone.utc)
+    return (value - UNIX_EPOCH) // timedelta(microseconds=1)
+
+def get_epoch_timestamps(epochs: List[str]) -> np.ndarray:
+    """
+    Convert EPOCH strings into microseconds since the Unix epoch.
+
+    Args:
+        epochs (List[str]): EPOCH strings from the ISS data.
+
+    Returns:
+        np.ndarray: Int64 timestamps in the same (ascending) order as the epochs.
+    """
+    return np.fromiter(
+        (to_unix_us(datetime.strptime(epoch, EPOCH_FORMAT).replace(tzinfo=timezone.utc)) for epoch in epochs),
+        dtype=np.int64,
+        count=len(epochs),
+    )
+
+def get_closest_data_point(state_vectors: StateVectors) -> int:
+    """
+    Find the closest data point to the current time in UTC time zone.
 
-    # Create a copy (lambda) of the original list before sorting
-    sorted_data = sorted(iss_data, key=lambda x: abs(now - parser.isoparse(x["EPOCH"])))
+    Args:
+        state_vectors (StateVectors): ISS state vectors.
 
-    return sorted_data[0]
+    Returns:
+        int: Index of the closest data point.
+    """
+    epoch_us = state_vectors.epoch_us
 
-def cal_average_speed(iss_data: List[Dict[str, Any]]) -> float:
+    # Get current UTC time
+    now = to_unix_us(datetime.now(timezone.utc))
+
+    # Epochs are sorted, so the closest one is on either side of the insertion point
+    i = int(np.searchsorted(epoch_us, now))
+    if i == 0:
+        return 0
+    if i == len(epoch_us):
+        return len(epoch_us) - 1
+    if now - epoch_us[i - 1] <= epoch_us[i] - now:
+        return i - 1
+    return i
+
+def cal_average_speed(state_vectors: StateVectors) -> float:
     """
     Calculates the average speed over the ISS data set.
 
     Args:
-        iss_data (List[Dict[str, Any]]): List of dicts of ISS data.
+        state_vectors (StateVectors): ISS state vectors.
 
     Returns:
         float: Average speed.
     """
     try:
-        total_speed = 0.0
-        for data_point in iss_data:
-            # add up all speed
-            total_speed += (data_point["X_DOT"]**2 + data_point["Y_DOT"]**2 + data_point["Z_DOT"]**2)**0.5
+        if not state_vectors:
+            return 0.0
 
         # cal avg speed
-        return total_speed / len(iss_data) if iss_data else 0.0
+        return float(state_vectors.speeds.mean())
 
     except Exception as e:
-        logging.error(f"Error calculating speed: {e}")
+        logger.error("Error calculating speed: %s", e)
         return 0.0
 
-def cal_instantaneous_speed(epoch_data: List[Dict[str, Any]]) -> float:
+def great_circle_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
-    Calculate instantaneous speed for a specific Epoch.
+    Calculate the haversine distance between two points on the Earth's surface.
+
     Args:
-        epoch_data (List[Dict[str, Any]]): List of the epoch.
+        lat1 (float): Latitude of the first point in degrees.
+        lon1 (float): Longitude of the first point in degrees.
+        lat2 (float): Latitude of the second point in degrees.
+        lon2 (float): Longitude of the second point in degrees.
 
     Returns:
-        float: Instantaneous speed.
+        float: Distance in km.
     """
-    speed = (
-        float(epoch_data["X_DOT"])**2 +
-        float(epoch_data["Y_DOT"])**2 +
-        float(epoch_data["Z_DOT"])**2
-    )**0.5
-    return speed
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+@lru_cache(maxsize=4096)
+def reverse_geocode(latitude: float, longitude: float) -> str:
+    """
+    Look up the nearest city below a position offline, memoized per coordinate pair.
 
-# Return entire data set
-@app.route('/epochs', methods=['GET'])
-def get_epochs():
-    data = get_iss_data_cached()
+    Args:
+        latitude (float): Latitude in degrees, rounded by the caller.
+        longitude (float): Longitude in degrees, rounded by the caller.
 
-    if data:
-        return jsonify(data)
-    return jsonify({"error": "Failed to fetch ISS data"}), 500
+    Returns:
+        str: "City, Region, Country code" of the nearest city, or "Over ocean" if it is too far away.
+    """
+    # Single-process k-d tree query; the GeoNames tree is loaded on the first call
+    city = reverse_geocoder.search([(latitude, longitude)], mode=1)[0]
+    if great_circle_distance(latitude, longitude, float(city["lat"]), float(city["lon"])) > OCEAN_DISTANCE_KM:
+        return "Over ocean"
+    return ", ".join(part for part in (city["name"], city["admin1"], city["cc"]) if part)
 
-# Return modified list of Epochs given query parameters
+# Return the entire data set, or a page of it given limit/offset query parameters
 @app.route('/epochs', methods=['GET'])
 def get_modified_epochs_list():
     try:
+        paginate = 'limit' in request.args or 'offset' in request.args
+
         # Get limit and offset from query parameters
         limit = int(request.args.get('limit', default=5))  # default limit is 5   
         offset = int(request.args.get('offset', default=0))  # default offset is 0  
@@ -219,75 +539,77 @@ def get_modified_epochs_list():
 
         data = get_iss_data_cached()
 
-        if data:
-            result = data[offset:offset + limit]
-            return jsonify(result)
+        if not data:
+            return jsonify({"error": "Failed to fetch ISS data"}), 500
+
+        # Without query parameters the entire data set is returned
+        if not paginate:
+            return jsonify(data.records())
+
+        result = data.records(offset, offset + limit)
+        return jsonify(result)
     
     except ValueError as ve:
         return jsonify({"error": "Invalid value for limit or offset", "details": str(ve)}), 400
 
     except Exception as e:
-        logging.error("Unexpected error occurred", exc_info=True)
+        logger.error("Unexpected error occurred", exc_info=True)
         return jsonify({"error": "Internal server error"}), 500
 
 # Return state vectors for a specific Epoch from the data set
 @app.route('/epochs/<epoch>', methods=['GET'])
 def get_state_vectors_for_epoch(epoch: str):
     try:
-        parsed_iss_data = get_iss_data_cached()
+        state_vectors = get_iss_data_cached()
 
-        if parsed_iss_data:
-            epoch_data = [data for data in parsed_iss_data if data["EPOCH"] == epoch]
-            if epoch_data:
-                return jsonify(epoch_data)
+        if state_vectors:
+            i = state_vectors.epoch_index.get(epoch)
+            if i is not None:
+                return jsonify([state_vectors.record(i)])
         return jsonify({"error": f"No data found for the specified epoch: {epoch}"}), 404
 
     except Exception as e:
-        logging.error("Unexpected error occurred", exc_info=True)
+        logger.error("Unexpected error occurred", exc_info=True)
         return jsonify({"error": "Internal server error"}), 500
 
 # Route to get instantaneous speed for a specific Epoch in the data set
 @app.route('/epochs/<epoch>/speed', methods=['GET'])
 def get_instantaneous_speed_for_epoch(epoch: str):
     try:
-        parsed_iss_data = get_iss_data_cached()
+        state_vectors = get_iss_data_cached()
 
-        if parsed_iss_data:
-            epoch_data = [data for data in parsed_iss_data if data["EPOCH"] == epoch]
-            if epoch_data:
-                speed = cal_instantaneous_speed(epoch_data[0])
-                return jsonify({"instantaneous_speed": speed})
+        if state_vectors:
+            i = state_vectors.epoch_index.get(epoch)
+            if i is not None:
+                return jsonify({"instantaneous_speed": float(state_vectors.speeds[i])})
             return jsonify({"error": f"No data found for the specified epoch: {epoch}"}), 404
 
     except Exception as e:
-        logging.error("Unexpected error occurred", exc_info=True)
+        logger.error("Unexpected error occurred", exc_info=True)
         return jsonify({"error": "Internal server error"}), 500
 
 # Return latitude, longitude, altitude, and geoposition for a specific Epoch in the data set
 @app.route('/epochs/<epoch>/location', methods=['GET'])
 def get_epoch_location(epoch):
-    data = get_iss_data_cached()
+    state_vectors = get_iss_data_cached()
 
-    state = next((s for s in data if s.get("epoch") == epoch), None)
+    i = state_vectors.epoch_index.get(epoch) if state_vectors else None
 
-    if state is None:
+    if i is None:
         return jsonify({"error": "Epoch not found"}), 404
 
-    position = state.get("position", {})
-    x, y, z = position.get("x", 0), position.get("y", 0), position.get("z", 0)
-    
-    xy_sqrt = math.sqrt(x**2 + y**2)
-    latitude = math.degrees(math.atan2(z, xy_sqrt))
+    x, y, z = state_vectors.positions[i].tolist()
+
+    xy_norm = math.hypot(x, y)
+    latitude = math.degrees(math.atan2(z, xy_norm))
     longitude = math.degrees(math.atan2(y, x))
-    altitude = math.sqrt(x**2 + y**2 + z**2) - 6371  # Earth's radius in km
+    altitude = math.hypot(xy_norm, z) - EARTH_RADIUS_KM
 
-    geolocator = Nominatim(user_agent="iss_tracker")
-    
     try:
-        location = geolocator.reverse((latitude, longitude), language="en", exactly_one=True)
-        geoposition = location.address if location else "Unknown"
+        # Round to ~1 km so nearby positions share a cached lookup
+        geoposition = reverse_geocode(round(latitude, 2), round(longitude, 2))
     except Exception as e:
-        print(f"Geolocation error: {e}")
+        logger.warning("Geolocation error: %s", e)
         geoposition = "Unknown"
 
     return jsonify({
@@ -302,21 +624,25 @@ def get_epoch_location(epoch):
 @app.route('/now', methods=['GET'])
 def get_nearest_epoch():
     try:
-        parsed_iss_data = fetch_iss_data()
+        state_vectors = get_iss_data_cached()
 
-        if parsed_iss_data:
+        if state_vectors:
             # Find the closest data point to 'now'
-            closest_data_point = get_closest_data_point(parsed_iss_data)
+            i = get_closest_data_point(state_vectors)
+            closest_data_point = state_vectors.record(i)
 
-            # Calculate and include instantaneous speed closest to 'now'
-            closest_data_point["instantaneous_speed"] = cal_instantaneous_speed(closest_data_point)
+            # Include the precomputed instantaneous speed closest to 'now'
+            closest_data_point["instantaneous_speed"] = float(state_vectors.speeds[i])
 
             return jsonify(closest_data_point)
         return jsonify({"error": "Failed to fetch ISS data"}), 500
 
     except Exception as e:
-        logging.error("Unexpected error occurred", exc_info=True)
+        logger.error("Unexpected error occurred", exc_info=True)
         return jsonify({"error": "Internal server error"}), 500
 
 if __name__ == "__main__":
+    # With debug=True the reloader re-runs this module in a child process; only the child serves
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_cache_refresher()
     app.run(debug=True)
\ No newline at end of file
@@ -1,37 +1,60 @@
 import pytest
-from datetime import datetime
+from datetime import datetime, timezone
+import iss_tracker
 from iss_tracker import (
     parse_iss_data,
     get_time_range,
     get_closest_data_point,
-    cal_average_speed
+    get_epoch_timestamps,
+    cal_average_speed,
+    reverse_geocode,
+    StateVectors
 )
 
 @pytest.fixture
 def sample_xml_data():
-    return {
-        "ndm": {
-            "oem": {
-                "body": {
-                    "segment": {
-                        "data": {
-                            "stateVector": [ 
-                                
-                                {'EPOCH': '2025-058T11:53:00.000Z', 'X': {'@units': 'km', '#text': '2674.73145218746'}, 'Y': {'@units': 'km', '#text': '3316.2289606109498'}, 'Z': {'@units': 'km', '#text': '-5297.4214788776399'}, 'X_DOT': {'@units': 'km/s', '#text': '-5.3196592851300499'}, 'Y_DOT': {'@units': 'km/s', '#text': '5.4534040548973604'}, 'Z_DOT': {'@units': 'km/s', '#text': '0.73246350063873'}}, 
-                                
-                                {'EPOCH': '2025-058T11:57:00.000Z', 'X': {'@units': 'km', '#text': '1316.58492360587'}, 'Y': {'@units': 'km', '#text': '4489.0743177531904'}, 'Z': {'@units': 'km', '#text': '-4931.3291171098199'}, 'X_DOT': {'@units': 'km/s', '#text': '-5.9294790985872803'}, 'Y_DOT': {'@units': 'km/s', '#text': '4.2606771881374801'}, 'Z_DOT': {'@units': 'km/s', '#text': '2.2999334681557699'}}, 
-                                
-                                {'EPOCH': '2025-058T12:00:00.000Z', 'X': {'@units': 'km', '#text': '229.643996617211'}, 'Y': {'@units': 'km', '#text': '5158.9603929330797'}, 'Z': {'@units': 'km', '#text': '-4419.0464244079003'}, 'X_DOT': {'@units': 'km/s', '#text': '-6.1063351683023903'}, 'Y_DOT': {'@units': 'km/s', '#text': '3.1568493905097599'}, 'Z_DOT': {'@units': 'km/s', '#text': '3.37272993036005'}}
-                            ]
-                        }
-                    }
-                }
-            }
-        }
-    }
+    return b"""<?xml version="1.0" encoding="UTF-8"?>
+<ndm>
+  <oem>
+    <body>
+      <segment>
+        <data>
+          <stateVector>
+            <EPOCH>2025-058T11:53:00.000Z</EPOCH>
+            <X units="km">2674.73145218746</X>
+            <Y units="km">3316.2289606109498</Y>
+            <Z units="km">-5297.4214788776399</Z>
+            <X_DOT units="km/s">-5.3196592851300499</X_DOT>
+            <Y_DOT units="km/s">5.4534040548973604</Y_DOT>
+            <Z_DOT units="km/s">0.73246350063873</Z_DOT>
+          </stateVector>
+          <stateVector>
+            <EPOCH>2025-058T11:57:00.000Z</EPOCH>
+            <X units="km">1316.58492360587</X>
+            <Y units="km">4489.0743177531904</Y>
+            <Z units="km">-4931.3291171098199</Z>
+            <X_DOT units="km/s">-5.9294790985872803</X_DOT>
+            <Y_DOT units="km/s">4.2606771881374801</Y_DOT>
+            <Z_DOT units="km/s">2.2999334681557699</Z_DOT>
+          </stateVector>
+          <stateVector>
+            <EPOCH>2025-058T12:00:00.000Z</EPOCH>
+            <X units="km">229.643996617211</X>
+            <Y units="km">5158.9603929330797</Y>
+            <Z units="km">-4419.0464244079003</Z>
+            <X_DOT units="km/s">-6.1063351683023903</X_DOT>
+            <Y_DOT units="km/s">3.1568493905097599</Y_DOT>
+            <Z_DOT units="km/s">3.37272993036005</Z_DOT>
+          </stateVector>
+        </data>
+      </segment>
+    </body>
+  </oem>
+</ndm>
+"""
 
 @pytest.fixture
-def sample_iss_data():
+def sample_records():
     return [
         {
             'EPOCH': '2025-058T11:53:00.000Z',
@@ -62,12 +85,30 @@ def sample_iss_data():
         }
     ]
 
+@pytest.fixture
+def sample_iss_data(sample_records):
+    return StateVectors.from_records(sample_records)
+
 def test_parse_iss_data(sample_xml_data):
     parsed_iss_data = parse_iss_data(sample_xml_data)
     assert len(parsed_iss_data) == 3
-    assert parsed_iss_data[0]["EPOCH"] == "2025-058T11:53:00.000Z"
-    assert parsed_iss_data[1]["X"] == 1316.58492360587
-    assert parsed_iss_data[2]["X_DOT"] == -6.10633516830239
+    assert parsed_iss_data.epochs[0] == "2025-058T11:53:00.000Z"
+    assert parsed_iss_data.positions[1, 0] == 1316.58492360587
+    assert parsed_iss_data.velocities[2, 0] == -6.10633516830239
+
+def test_parse_iss_data_skips_malformed_vector(sample_xml_data):
+    malformed = sample_xml_data.replace(b">1316.58492360587<", b">not a number<")
+    parsed_iss_data = parse_iss_data(malformed)
+
+    assert parsed_iss_data.epochs == ["2025-058T11:53:00.000Z", "2025-058T12:00:00.000Z"]
+    assert parsed_iss_data.positions[1, 0] == 229.643996617211
+
+def test_parse_iss_data_ignores_fields_outside_state_vectors(sample_xml_data):
+    stray = sample_xml_data.replace(b"<ndm>", b"<ndm><X>1</X><EPOCH>header</EPOCH>")
+    parsed_iss_data = parse_iss_data(stray)
+
+    assert len(parsed_iss_data) == 3
+    assert parsed_iss_data.epochs[0] == "2025-058T11:53:00.000Z"
 
 def test_get_time_range(sample_iss_data):
     time_range = get_time_range(sample_iss_data)
@@ -77,10 +118,24 @@ def test_get_time_range(sample_iss_data):
 
     assert time_range == (expected_start, expected_end)
 
-def test_get_closest_data_point(sample_iss_data):
+def test_get_epoch_timestamps(sample_iss_data):
+    epoch_us = get_epoch_timestamps(sample_iss_data.epochs)
+    expected_start = datetime(2025, 2, 27, 11, 53, 0, tzinfo=timezone.utc)
+
+    assert epoch_us[0] == int(expected_start.timestamp()) * 1_000_000
+    assert epoch_us[2] - epoch_us[1] == 180 * 1_000_000
+
+def test_get_closest_data_point(sample_iss_data, monkeypatch):
+    # Freeze 'now' between the first and second epochs
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls(2025, 2, 27, 11, 54, 0, tzinfo=tz)
+
+    monkeypatch.setattr(iss_tracker, "datetime", FrozenDatetime)
     closest_data_point = get_closest_data_point(sample_iss_data)
 
-    assert closest_data_point["EPOCH"] == "2025-058T11:53:00.000Z"
+    assert sample_iss_data.epochs[closest_data_point] == "2025-058T11:53:00.000Z"
 
 def test_cal_average_speed(sample_iss_data):
     avg_speed = cal_average_speed(sample_iss_data)
@@ -89,6 +144,157 @@ def test_cal_average_speed(sample_iss_data):
 
     assert abs(avg_speed - expected_avg_speed) <= tolerance
 
+def test_state_vectors_records(sample_iss_data, sample_records):
+    assert sample_iss_data.records() == sample_records
+    assert sample_iss_data.records(1, 2) == sample_records[1:2]
+    assert sample_iss_data.record(2) == sample_records[2]
+
+def test_state_vectors_epoch_index(sample_iss_data):
+    assert sample_iss_data.epoch_index["2025-058T11:57:00.000Z"] == 1
+    assert sample_iss_data.epoch_index.get("2025-058T13:00:00.000Z") is None
+
+def test_state_vectors_speeds(sample_iss_data):
+    assert sample_iss_data.speeds.tolist() == pytest.approx([7.653424, 7.655180, 7.656914], abs=1e-6)
+
+def test_state_vectors_msgpack_round_trip(sample_iss_data, sample_records):
+    loaded = StateVectors.from_msgpack(sample_iss_data.to_msgpack())
+
+    assert len(loaded) == 3
+    assert loaded.records() == sample_records
+
+def test_reverse_geocode():
+    assert reverse_geocode(29.76, -95.37) == "Houston, Texas, US"
+    assert reverse_geocode(0.0, -140.0) == "Over ocean"
+
+@pytest.mark.parametrize("acquired, expected_fetches", [(True, 1), (False, 0)])
+def test_refresh_iss_data(monkeypatch, acquired, expected_fetches):
+    fetches = []
+
+    class FakeLock:
+        def acquire(self, blocking=True):
+            return acquired
+
+    class FakeRedis:
+        def lock(self, name, timeout=None):
+            return FakeLock()
+
+    monkeypatch.setattr(iss_tracker, "r", FakeRedis())
+    monkeypatch.setattr(iss_tracker, "fetch_iss_data", lambda: fetches.append(True))
+    iss_tracker.refresh_iss_data()
+
+    assert len(fetches) == expected_fetches
+
+def test_fetch_iss_data_keeps_cache_on_empty_parse(monkeypatch):
+    class FakeResponse:
+        ok = True
+        content = b"<ndm><oem></oem></ndm>"
+
+    class FakeSession:
+        def get(self, url):
+            return FakeResponse()
+
+    pipelines = []
+
+    class FakeRedis:
+        def pipeline(self):
+            pipelines.append(True)
+            raise RuntimeError("redis must not be written")
+
+    monkeypatch.setattr(iss_tracker, "get_session", lambda: FakeSession())
+    monkeypatch.setattr(iss_tracker, "r", FakeRedis())
+
+    assert iss_tracker.fetch_iss_data() is None
+    assert not pipelines
+
+def test_get_epochs_route(sample_iss_data, sample_records, monkeypatch):
+    monkeypatch.setattr(iss_tracker, "get_iss_data_cached", lambda: sample_iss_data)
+    client = iss_tracker.app.test_client()
+
+    assert client.get("/epochs").get_json() == sample_records
+    assert client.get("/epochs?limit=1&offset=1").get_json() == sample_records[1:2]
+    assert client.get("/epochs?offset=2").get_json() == sample_records[2:]
+    assert client.get("/epochs?limit=-1").status_code == 400
+
+def test_get_epoch_location_route(sample_iss_data, monkeypatch):
+    monkeypatch.setattr(iss_tracker, "get_iss_data_cached", lambda: sample_iss_data)
+    client = iss_tracker.app.test_client()
+
+    location = client.get("/epochs/2025-058T11:57:00.000Z/location").get_json()
+    assert abs(location["latitude"] - -46.5091) <= 0.001
+    assert abs(location["altitude_km"] - 426.29) <= 0.01
+    assert client.get("/epochs/2025-058T13:00:00.000Z/location").status_code == 404
+
+def test_get_iss_data_cached_skips_unchanged_payload(sample_iss_data, monkeypatch):
+    payload = sample_iss_data.to_msgpack()
+    store = {
+        "iss_state_vectors": payload,
+        "iss_state_vectors_version": iss_tracker.payload_version(payload),
+    }
+    reads = []
+
+    class FakeRedis:
+        def get(self, key):
+            reads.append(key)
+            return store.get(key)
+
+    monkeypatch.setattr(iss_tracker, "r", FakeRedis())
+    monkeypatch.setitem(iss_tracker._local_cache, "version", None)
+    monkeypatch.setitem(iss_tracker._local_cache, "state_vectors", None)
+
+    first = iss_tracker.get_iss_data_cached()
+    second = iss_tracker.get_iss_data_cached()
+
+    assert first is second
+    assert first.records() == sample_iss_data.records()
+    assert reads.count("iss_state_vectors") == 1
+
+def test_get_iss_data_cached_fetches_then_loads_from_redis(sample_xml_data, sample_records, monkeypatch):
+    store = {}
+
+    class FakePipeline:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            return False
+
+        def set(self, key, value, ex=None):
+            store[key] = value
+
+        def execute(self):
+            pass
+
+    class FakeRedis:
+        def get(self, key):
+            return store.get(key)
+
+        def pipeline(self):
+            return FakePipeline()
+
+    class FakeResponse:
+        ok = True
+        content = sample_xml_data
+
+    class FakeSession:
+        def get(self, url):
+            return FakeResponse()
+
+    monkeypatch.setattr(iss_tracker, "r", FakeRedis())
+    monkeypatch.setattr(iss_tracker, "get_session", lambda: FakeSession())
+    monkeypatch.setitem(iss_tracker._local_cache, "version", None)
+    monkeypatch.setitem(iss_tracker._local_cache, "state_vectors", None)
+
+    # Cache miss: fetched from NASA and written to redis
+    fetched = iss_tracker.get_iss_data_cached()
+    assert fetched.records() == sample_records
+    assert set(store) == {"iss_state_vectors", "iss_state_vectors_version"}
+
+    # Another process with an empty local cache decodes the redis payload
+    iss_tracker._local_cache.update(version=None, state_vectors=None)
+    loaded = iss_tracker.get_iss_data_cached()
+    assert loaded is not fetched
+    assert loaded.records() == sample_records
+
 if __name__ == '__main__':
     # Run tests: pytest
     pytest.main(['-v'])